@@ -12,9 +12,10 @@ The Agent (which IS a LLM) processes these prompts and writes results back.
 """
 
 import json
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from .taxonomy import get_taxonomy_prompt_block, TAXONOMY, ALL_L1
+from .taxonomy import get_taxonomy_prompt_block, TAXONOMY, TAXONOMY_SETS, FIRST_L2, ALL_L1
 
 
 BATCH_SIZE = 20
@@ -85,26 +86,27 @@ def apply_tag_inheritance(df: pd.DataFrame, overrides_path: str) -> pd.DataFrame
     if overrides.empty:
         return df
 
-    # Build lookup: (transaction_id, source_platform) -> (l1, l2)
-    tag_map = {}
-    for _, row in overrides.iterrows():
-        key = (str(row["transaction_id"]).strip(), str(row["source_platform"]).strip())
-        tag_map[key] = (
-            str(row["global_category_l1"]).strip(),
-            str(row["global_category_l2"]).strip(),
-        )
-
-    # Apply to DataFrame
-    inherited_count = 0
-    for idx, row in df.iterrows():
-        if row["track"] != "consumption":
-            continue
-        key = (str(row["transaction_id"]).strip(), str(row["source_platform"]).strip())
-        if key in tag_map:
-            l1, l2 = tag_map[key]
-            df.at[idx, "global_category_l1"] = l1
-            df.at[idx, "global_category_l2"] = l2
-            inherited_count += 1
+    # Vectorized hash-join on (transaction_id, source_platform) instead of
+    # a per-row dict lookup with scalar writes
+    lookup = overrides.fillna("")
+    for col in lookup.columns:
+        lookup[col] = lookup[col].str.strip()
+    # Last row wins on duplicate keys, matching the old dict behaviour
+    lookup = lookup.drop_duplicates(subset=["transaction_id", "source_platform"], keep="last")
+    lookup = lookup.rename(columns={"global_category_l1": "_l1_new", "global_category_l2": "_l2_new"})
+
+    # Join only the key columns so the frame itself is never copied; restore
+    # df's index afterwards (merge resets it)
+    joined = pd.DataFrame({
+        "transaction_id": df["transaction_id"].astype(str).str.strip(),
+        "source_platform": df["source_platform"].astype(str).str.strip(),
+    }).merge(lookup, on=["transaction_id", "source_platform"], how="left")
+    joined.index = df.index
+
+    mask = (df["track"] == "consumption") & joined["_l1_new"].notna()
+    df.loc[mask, "global_category_l1"] = joined.loc[mask, "_l1_new"]
+    df.loc[mask, "global_category_l2"] = joined.loc[mask, "_l2_new"]
+    inherited_count = int(mask.sum())
 
     print(f"  Tag inheritance: {inherited_count} records recovered from overrides")
     return df
@@ -139,6 +141,22 @@ def generate_tagging_batches(df: pd.DataFrame, output_dir: str) -> list[dict]:
     if records_to_tag.empty:
         return []
 
+    # Deduplicate by content fingerprint: repeat purchases (same platform,
+    # counterparty, description and amount) share one prompt slot and get the
+    # LLM's answer broadcast back, so cost scales with unique merchants
+    # instead of row count.
+    fp = pd.util.hash_pandas_object(
+        records_to_tag[
+            ["source_platform", "counterparty", "description", "amount"]
+        ].astype(str),
+        index=False,
+    )
+    groups: dict = {}
+    for row_idx, h in zip(records_to_tag.index, fp.to_numpy()):
+        groups.setdefault(h, []).append(row_idx)
+    grouped_rows = list(groups.values())
+    records_to_tag = records_to_tag.loc[[rows[0] for rows in grouped_rows]]
+
     taxonomy_block = get_taxonomy_prompt_block()
     batches = []
 
@@ -146,14 +164,19 @@ def generate_tagging_batches(df: pd.DataFrame, output_dir: str) -> list[dict]:
         batch = records_to_tag.iloc[start : start + BATCH_SIZE]
         lines = []
 
-        for i, (idx, row) in enumerate(batch.iterrows(), 1):
-            counterparty = row["counterparty"] or "未知"
-            desc = row["description"] or "无描述"
-            amount = row["amount"]
-            platform = row["source_platform"]
+        # itertuples over just the needed columns — iterrows boxes every
+        # row into a Series
+        prompt_cols = batch[
+            ["counterparty", "description", "amount", "source_platform", "platform_category"]
+        ]
+        for i, (counterparty, desc, amount, platform, pcat) in enumerate(
+            prompt_cols.itertuples(index=False, name=None), 1
+        ):
+            counterparty = counterparty or "未知"
+            desc = desc or "无描述"
             hint = ""
-            if row["platform_category"]:
-                hint = f" (平台原标签: {row['platform_category']})"
+            if pcat:
+                hint = f" (平台原标签: {pcat})"
             lines.append(
                 f"{i}. [{platform}] {counterparty} | {desc} | ¥{amount:.2f}{hint}"
             )
@@ -166,6 +189,7 @@ def generate_tagging_batches(df: pd.DataFrame, output_dir: str) -> list[dict]:
         batches.append({
             "file": str(batch_file),
             "indices": list(batch.index),
+            "group_indices": grouped_rows[start : start + BATCH_SIZE],
             "count": len(batch),
         })
 
@@ -203,10 +227,13 @@ def apply_tagging_results(df: pd.DataFrame, results_dir: str) -> pd.DataFrame:
     with open(manifest_file, "r", encoding="utf-8") as f:
         batches = json.load(f)
 
+    # Accumulate all validated updates, then write them in one block-level
+    # assignment instead of a scalar/per-item setitem for each result
+    idx_list: list = []
+    l1_list: list = []
+    l2_list: list = []
+
     for batch in batches:
-        result_file = results_path / Path(batch["file"]).stem.replace(
-            "batch_", "batch_"
-        )
         result_file = results_path / f"{Path(batch['file']).stem}_result.json"
 
         if not result_file.exists():
@@ -216,19 +243,29 @@ def apply_tagging_results(df: pd.DataFrame, results_dir: str) -> pd.DataFrame:
             results = json.load(f)
 
         indices = batch["indices"]
+        # Older manifests predate fingerprint dedup: one row per prompt slot
+        group_indices = batch.get("group_indices") or [[idx] for idx in indices]
         for item in results:
             i = item.get("index", 0) - 1  # 1-indexed to 0-indexed
-            if 0 <= i < len(indices):
-                row_idx = indices[i]
-                l1 = item.get("l1", "")
-                l2 = item.get("l2", "")
-
-                # Validate against taxonomy
-                if l1 in TAXONOMY:
-                    df.at[row_idx, "global_category_l1"] = l1
-                    if l2 in TAXONOMY[l1]:
-                        df.at[row_idx, "global_category_l2"] = l2
-                    else:
-                        df.at[row_idx, "global_category_l2"] = TAXONOMY[l1][0]
+            if not (0 <= i < len(group_indices)):
+                continue
+
+            # Validate against taxonomy, then broadcast to the whole group
+            l1 = item.get("l1", "")
+            if l1 not in TAXONOMY:
+                continue
+            l2 = item.get("l2", "")
+            if l2 not in TAXONOMY_SETS[l1]:
+                l2 = FIRST_L2[l1]
+
+            rows = group_indices[i]
+            idx_list.extend(rows)
+            l1_list.extend([l1] * len(rows))
+            l2_list.extend([l2] * len(rows))
+
+    if idx_list:
+        df.loc[idx_list, ["global_category_l1", "global_category_l2"]] = (
+            np.column_stack([l1_list, l2_list])
+        )
 
     return df
@@ -36,12 +36,23 @@ ALL_L1 = list(TAXONOMY.keys())
 # Flat list of all (L1, L2) tuples
 ALL_L1_L2 = [(l1, l2) for l1, l2s in TAXONOMY.items() for l2 in l2s]
 
+# O(1) membership per L1 — TAXONOMY values are lists, so `l2 in TAXONOMY[l1]`
+# is a linear scan
+TAXONOMY_SETS = {l1: frozenset(l2s) for l1, l2s in TAXONOMY.items()}
+
+# Reverse map L2 -> owning L1
+L2_TO_L1 = {l2: l1 for l1, l2s in TAXONOMY.items() for l2 in l2s}
+
+# Default L2 fallback per L1 (first child)
+FIRST_L2 = {l1: l2s[0] for l1, l2s in TAXONOMY.items()}
+
+
+
+# TAXONOMY is a module constant, so the prompt block is too — built once
+# at import instead of per call
+_TAXONOMY_PROMPT = "\n".join(f"[{l1}: {' / '.join(l2s)}]" for l1, l2s in TAXONOMY.items())
 
 
 def get_taxonomy_prompt_block() -> str:
-    """Generate the taxonomy section for LLM prompts."""
-    lines = []
-    for l1, l2s in TAXONOMY.items():
-        l2_str = " / ".join(l2s)
-        lines.append(f"[{l1}: {l2_str}]")
-    return "\n".join(lines)
+    """Return the (precomputed) taxonomy section for LLM prompts."""
+    return _TAXONOMY_PROMPT
@@ -6,26 +6,27 @@ investments, credit repayments, etc.)
 """
 
 import re
+import numpy as np
 import pandas as pd
 
 
 # Alipay categories that belong to cashflow track
-ALIPAY_CASHFLOW_CATEGORIES = {
+ALIPAY_CASHFLOW_CATEGORIES = frozenset({
     "转账红包",
     "投资理财",
     "信用借还",
     "收入",
-}
+})
 
 # WeChat transaction types that are cashflow
-WECHAT_CASHFLOW_TYPES = {
+WECHAT_CASHFLOW_TYPES = frozenset({
     "转账",
     "微信红包（单发）",
     "微信红包（群红包）",
     "微信红包",
     "二维码收款",
     "群收款",
-}
+})
 
 # Partial match patterns for WeChat cashflow
 WECHAT_CASHFLOW_PATTERNS = [
@@ -33,148 +34,93 @@ WECHAT_CASHFLOW_PATTERNS = [
     "零钱通",
 ]
 
-
-def _classify_alipay_track(row: pd.Series) -> str:
-    """Determine track for an Alipay record."""
-    # Already processed refunds
-    if row["track"] == "refund_processed":
-        return "refund_processed"
-
-    # 不计收支 -> cashflow
-    if row["direction"] == "不计收支":
-        return "cashflow"
-
-    # 收入 direction -> cashflow
-    if row["direction"] == "收入":
-        return "cashflow"
-
-    # Cashflow categories
-    if row["platform_category"] in ALIPAY_CASHFLOW_CATEGORIES:
-        return "cashflow"
-
-    # 退款 category (unmatched refunds) -> cashflow
-    if row["platform_category"] == "退款":
-        return "cashflow"
-
-    # Everything else with direction=支出 -> consumption
-    if row["direction"] == "支出":
-        return "consumption"
-
-    return "cashflow"
-
-
-def _classify_wechat_track(row: pd.Series) -> str:
-    """Determine track for a WeChat record."""
-    # Already processed refunds
-    if row["track"] == "refund_processed":
-        return "refund_processed"
-
-    # Refund income rows
-    if row["is_ignored"]:
-        return "refund_processed"
-
-    tx_type = str(row["platform_tx_type"])
-
-    # Explicit cashflow types
-    if tx_type in WECHAT_CASHFLOW_TYPES:
-        return "cashflow"
-
-    # Pattern-based cashflow
-    for pattern in WECHAT_CASHFLOW_PATTERNS:
-        if pattern in tx_type:
-            return "cashflow"
-
-    # Refund types
-    if "退款" in tx_type:
-        return "refund_processed"
-
-    # 收入 direction -> cashflow
-    if row["direction"] == "收入":
-        return "cashflow"
-
-    # 中性 (neutral) -> cashflow
-    if row["direction"] == "中性":
-        return "cashflow"
-
-    # 扫二维码付款 with status "已转账" -> cashflow (person-to-person)
-    if tx_type == "扫二维码付款" and "已转账" in str(row["status"]):
-        return "cashflow"
-
-    # 商户消费 / 扫二维码付款 (with 支付成功) -> consumption
-    if tx_type in ("商户消费", "扫二维码付款"):
-        return "consumption"
-
-    return "cashflow"
-
-
-def _classify_jd_track(row: pd.Series) -> str:
-    """Determine track for a JD record."""
-    # Already processed refunds
-    if row["track"] == "refund_processed":
-        return "refund_processed"
-
-    # Standalone refund rows
-    if row["status"] == "退款成功":
-        return "refund_processed"
-
-    # 不计收支 → cashflow (白条还款, 小金库, 预授权 etc.)
-    if row["direction"] == "不计收支":
-        return "cashflow"
-
-    # 收入 → cashflow (小金库红包 etc.)
-    if row["direction"] == "收入":
-        return "cashflow"
-
-    # 支出 → consumption
-    if row["direction"] == "支出":
-        return "consumption"
-
-    return "cashflow"
-
-
-def _classify_meituan_track(row: pd.Series) -> str:
-    """Determine track for a Meituan record."""
-    # Already processed refunds
-    if row["track"] == "refund_processed":
-        return "refund_processed"
-
-    tx_type = str(row["platform_tx_type"])
-
-    # 退款 → refund_processed
-    if tx_type == "退款":
-        return "refund_processed"
-
-    # 还款 (美团月付代扣还款) → cashflow
-    if tx_type == "还款":
-        return "cashflow"
-
-    # 支付 + 支出 → consumption
-    if tx_type == "支付" and row["direction"] == "支出":
-        return "consumption"
-
-    return "cashflow"
+# Single alternation so the pattern check is one vectorized scan
+_WECHAT_CASHFLOW_RE = re.compile("|".join(re.escape(p) for p in WECHAT_CASHFLOW_PATTERNS))
 
 
 def apply_track_classification(df: pd.DataFrame) -> pd.DataFrame:
     """
     Classify each record into consumption or cashflow track.
 
-    Must be run AFTER refund netting.
+    Must be run AFTER refund netting. One np.select pass over vectorized
+    masks replaces the old per-row classification loop; conditions are
+    listed per platform in rule-priority order (first match wins), and
+    rows that are already classified (e.g. refund_processed) or belong to
+    an unknown platform keep their existing track.
+
+    Mutates and returns the input frame — the pipeline steps run in
+    sequence on one frame, so each stage no longer pays for a full copy.
     """
-    df = df.copy()
-
-    for idx, row in df.iterrows():
-        if row["track"] and row["track"] != "":
-            # Already classified (e.g. refund_processed)
-            continue
-
-        if row["source_platform"] == "alipay":
-            df.at[idx, "track"] = _classify_alipay_track(row)
-        elif row["source_platform"] == "wechat":
-            df.at[idx, "track"] = _classify_wechat_track(row)
-        elif row["source_platform"] == "jd":
-            df.at[idx, "track"] = _classify_jd_track(row)
-        elif row["source_platform"] == "meituan":
-            df.at[idx, "track"] = _classify_meituan_track(row)
+    # Same categorical conversion as apply_refund_netting — usually already
+    # done there, since netting runs first
+    for col in ("source_platform", "direction", "platform_category", "platform_tx_type", "status"):
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    sp = df["source_platform"]
+    direction = df["direction"]
+    pcat = df["platform_category"]
+    tx_type = df["platform_tx_type"]
+    status = df["status"]
+    unclassified = df["track"].fillna("").eq("")
+
+    alipay = unclassified & sp.eq("alipay")
+    wechat = unclassified & sp.eq("wechat")
+    jd = unclassified & sp.eq("jd")
+    meituan = unclassified & sp.eq("meituan")
+
+    conditions = [
+        # WeChat: refund income rows flagged by netting
+        wechat & df["is_ignored"].astype(bool),
+        # WeChat: explicit cashflow types, then 零钱通 patterns
+        wechat & tx_type.isin(WECHAT_CASHFLOW_TYPES),
+        wechat & tx_type.str.contains(_WECHAT_CASHFLOW_RE, na=False),
+        # WeChat: refund types
+        wechat & tx_type.str.contains("退款", regex=False, na=False),
+        # WeChat: 收入 / 中性 directions
+        wechat & direction.isin(["收入", "中性"]),
+        # WeChat: 扫二维码付款 with 已转账 status (person-to-person)
+        wechat & tx_type.eq("扫二维码付款") & status.str.contains("已转账", regex=False, na=False),
+        # WeChat: 商户消费 / 扫二维码付款 (with 支付成功)
+        wechat & tx_type.isin(["商户消费", "扫二维码付款"]),
+        wechat,
+        # Alipay: consumption iff 支出 outside the cashflow/退款 categories
+        # (不计收支 / 收入 directions and those categories are all cashflow)
+        alipay
+        & direction.eq("支出")
+        & ~pcat.isin(ALIPAY_CASHFLOW_CATEGORIES)
+        & pcat.ne("退款"),
+        alipay,
+        # JD: standalone refund rows, then direction decides
+        jd & status.eq("退款成功"),
+        jd & direction.eq("支出"),
+        jd,
+        # Meituan: 退款 → refund, 还款 (月付代扣) → cashflow, 支付+支出 → consumption
+        meituan & tx_type.eq("退款"),
+        meituan & tx_type.eq("还款"),
+        meituan & tx_type.eq("支付") & direction.eq("支出"),
+        meituan,
+    ]
+    choices = [
+        "refund_processed",
+        "cashflow",
+        "cashflow",
+        "refund_processed",
+        "cashflow",
+        "cashflow",
+        "consumption",
+        "cashflow",
+        "consumption",
+        "cashflow",
+        "refund_processed",
+        "consumption",
+        "cashflow",
+        "refund_processed",
+        "cashflow",
+        "consumption",
+        "cashflow",
+    ]
+
+    df["track"] = np.select(conditions, choices, default=df["track"].to_numpy())
 
     return df
@@ -6,50 +6,61 @@ and calculate effective (net) amounts.
 """
 
 import re
+import functools
+import numpy as np
 import pandas as pd
 
 
-def _net_alipay_refunds(df: pd.DataFrame) -> pd.DataFrame:
+def _net_alipay_refunds(df: pd.DataFrame, alipay: pd.Series) -> pd.DataFrame:
     """
     Alipay refund netting via transaction ID split.
 
     Refund records have compound IDs: originalTxId_refundSuffix or originalTxId*refundSuffix.
     The original_tx_id field was already extracted by the parser.
     """
-    # Build lookup: transaction_id -> row index (for expenditures)
-    tx_index = {}
-    for idx, row in df.iterrows():
-        if row["source_platform"] == "alipay" and row["direction"] == "支出":
-            tx_index[row["transaction_id"]] = idx
-
-    # Process refunds
-    for idx, row in df.iterrows():
-        if row["source_platform"] != "alipay":
-            continue
-        if row["status"] != "退款成功":
-            continue
-
-        # This is a refund record — mark it as ignored
-        df.at[idx, "is_ignored"] = True
-        df.at[idx, "track"] = "refund_processed"
-
-        # Try to match to original
-        orig_id = row["original_tx_id"]
-        if orig_id and orig_id in tx_index:
-            orig_idx = tx_index[orig_id]
-            refund_amt = row["amount"]
-
-            # Accumulate refund on original record
-            df.at[orig_idx, "is_refunded"] = True
-            df.at[orig_idx, "refund_amount"] += refund_amt
-            df.at[orig_idx, "effective_amount"] = max(
-                0, df.at[orig_idx, "amount"] - df.at[orig_idx, "refund_amount"]
-            )
+    if not alipay.any():
+        return df
+
+    refund_mask = alipay & df["status"].eq("退款成功")
+    if not refund_mask.any():
+        return df
+
+    # Refund rows are always ignored, matched or not
+    df.loc[refund_mask, "is_ignored"] = True
+    df.loc[refund_mask, "track"] = "refund_processed"
+
+    # Sum refunds per original transaction in one groupby, then resolve
+    # originals with a vectorized id -> row-index lookup
+    refunds = df.loc[refund_mask & (df["original_tx_id"].fillna("") != ""), ["original_tx_id", "amount"]]
+    if refunds.empty:
+        return df
+    refund_sums = refunds.groupby("original_tx_id")["amount"].sum()
+
+    exp_ids = df.loc[alipay & df["direction"].eq("支出"), "transaction_id"]
+    tx_to_idx = pd.Series(exp_ids.index.to_numpy(), index=exp_ids.to_numpy())
+    # Last occurrence wins on duplicate ids, matching the old dict build
+    tx_to_idx = tx_to_idx[~tx_to_idx.index.duplicated(keep="last")]
+
+    # One reindex probes pandas' internal hash map once per refund id;
+    # NaN marks refunds whose original transaction isn't in this export
+    mapped = tx_to_idx.reindex(refund_sums.index)
+    found = mapped.notna().to_numpy()
+    if not found.any():
+        return df
+    orig_rows = mapped.to_numpy()[found].astype(np.int64)
+    hit_sums = refund_sums.to_numpy()[found]
+
+    # Accumulate refunds on the original records in bulk
+    df.loc[orig_rows, "is_refunded"] = True
+    df.loc[orig_rows, "refund_amount"] = df.loc[orig_rows, "refund_amount"].to_numpy() + hit_sums
+    df.loc[orig_rows, "effective_amount"] = np.maximum(
+        0, df.loc[orig_rows, "amount"].to_numpy() - df.loc[orig_rows, "refund_amount"].to_numpy()
+    )
 
     return df
 
 
-def _net_wechat_refunds(df: pd.DataFrame) -> pd.DataFrame:
+def _net_wechat_refunds(df: pd.DataFrame, wechat: pd.Series) -> pd.DataFrame:
     """
     WeChat refund netting via status field self-description.
 
@@ -57,19 +68,22 @@ def _net_wechat_refunds(df: pd.DataFrame) -> pd.DataFrame:
     based on the '当前状态' field. This function just ensures refund income rows
     are properly ignored.
     """
-    for idx, row in df.iterrows():
-        if row["source_platform"] != "wechat":
-            continue
-
-        # Refund income rows (交易类型 = 'XXX-退款') are already marked is_ignored by parser
-        # Just ensure track is set
-        if row["is_ignored"] and "退款" in str(row["platform_tx_type"]):
-            df.at[idx, "track"] = "refund_processed"
+    if not wechat.any():
+        return df
+
+    # Refund income rows (交易类型 = 'XXX-退款') are already marked is_ignored
+    # by the parser — just ensure track is set, in one masked assignment
+    mask = (
+        wechat
+        & df["is_ignored"].astype(bool)
+        & df["platform_tx_type"].astype(str).str.contains("退款", regex=False, na=False)
+    )
+    df.loc[mask, "track"] = "refund_processed"
 
     return df
 
 
-def _net_jd_refunds(df: pd.DataFrame) -> pd.DataFrame:
+def _net_jd_refunds(df: pd.DataFrame, jd: pd.Series) -> pd.DataFrame:
     """
     JD refund netting.
 
@@ -79,20 +93,37 @@ def _net_jd_refunds(df: pd.DataFrame) -> pd.DataFrame:
     This function ensures standalone refund rows (交易状态=退款成功) are
     properly marked as ignored.
     """
-    for idx, row in df.iterrows():
-        if row["source_platform"] != "jd":
-            continue
-        if row["status"] == "退款成功":
-            df.at[idx, "is_ignored"] = True
-            df.at[idx, "track"] = "refund_processed"
+    if not jd.any():
+        return df
+
+    mask = jd & df["status"].eq("退款成功")
+    df.loc[mask, "is_ignored"] = True
+    df.loc[mask, "track"] = "refund_processed"
 
     return df
 
 
-def _extract_merchant_keywords(title: str) -> list[str]:
+# Compiled once — _extract_merchant_keywords runs per Meituan row. The
+# suffix patterns are order-independent substring removals, so they fold
+# into one alternation and the title is scanned once instead of four
+# times. ("-订单编号\S+" from the old chain is subsumed: the bare
+# "订单编号\S+" alternative always fired first.)
+_STRIP_RE = re.compile(r"代金券|招牌[^\s]*|订单详情|订单编号\S+|\d+人餐|单人餐|双人餐")
+# Trailing number IDs like "-301721361180131048" — anchored, so applied
+# after the suffix strip
+_TRAILING_ID_RE = re.compile(r"-\d{10,}$")
+# Pure brand names (Latin prefix before mixing)
+_BRAND_RE = re.compile(r"^([A-Za-z]+)")
+_DELIMS = ("(", "（", "-", "·", " ")
+
+
+@functools.lru_cache(maxsize=4096)
+def _extract_merchant_keywords(title: str) -> tuple[str, ...]:
     """
     Extract merchant keywords from Meituan order title for fuzzy matching.
-    Returns a list of candidate keywords (longest first) for flexible matching.
+    Returns a tuple of candidate keywords (longest first) for flexible
+    matching. Memoized — repeat orders from the same merchant share one
+    regex pass.
 
     Examples:
         "小象超市-订单编号1364001542164368" -> ["小象超市"]
@@ -113,14 +144,9 @@ def _extract_merchant_keywords(title: str) -> list[str]:
     # (e.g. 美团商家代金券-289529094000906348 purchase ↔ refund)
     keywords.append(title)
 
-    # Remove common suffixes
-    cleaned = re.sub(r"(代金券|招牌[^\s]*|订单详情|订单编号\S+)", "", title)
-    # Remove trailing number IDs like "-301721361180131048"
-    cleaned = re.sub(r"-\d{10,}$", "", cleaned)
-    # Remove meal suffixes
-    cleaned = re.sub(r"\d+人餐|单人餐|双人餐", "", cleaned)
-    # Remove "-订单编号XXX"
-    cleaned = re.sub(r"-订单编号\S+", "", cleaned)
+    # Remove common suffixes, then trailing number IDs
+    cleaned = _STRIP_RE.sub("", title)
+    cleaned = _TRAILING_ID_RE.sub("", cleaned)
 
     # Add cleaned version if different from raw
     full = cleaned.strip()
@@ -128,24 +154,24 @@ def _extract_merchant_keywords(title: str) -> list[str]:
         keywords.append(full)
 
     # Split by common delimiters and take first segment
-    for sep in ["(", "（", "-", "·", " "]:
+    for sep in _DELIMS:
         if sep in cleaned:
-            first = cleaned.split(sep)[0].strip()
+            first = cleaned.split(sep, 1)[0].strip()
             if first and first not in keywords:
                 keywords.append(first)
             break  # Only split by the first found delimiter
 
     # Extract pure brand names (Latin/CJK prefix before mixing)
-    brand = re.match(r"^([A-Za-z]+)", cleaned)
+    brand = _BRAND_RE.match(cleaned)
     if brand:
         b = brand.group(1)
         if b not in keywords and len(b) >= 2:
             keywords.append(b)
 
-    return keywords
+    return tuple(keywords)
 
 
-def _net_meituan_refunds(df: pd.DataFrame) -> pd.DataFrame:
+def _net_meituan_refunds(df: pd.DataFrame, meituan: pd.Series) -> pd.DataFrame:
     """
     Meituan refund netting via global index matching.
 
@@ -153,67 +179,109 @@ def _net_meituan_refunds(df: pd.DataFrame) -> pd.DataFrame:
     keywords. For each refund row, looks up candidates by keyword and
     picks the best match (closest in time, amount ≥ refund).
     """
-    meituan_mask = df["source_platform"] == "meituan"
-    meituan_df = df[meituan_mask]
-
-    # Build global index: keyword -> list of (idx, amount, timestamp)
+    if not meituan.any():
+        return df
+    meituan_df = df[meituan]
+
+    # Pull the hot columns to NumPy once — the matching loop then reads
+    # plain arrays instead of boxing every row into a Series
+    indices = meituan_df.index.to_numpy()
+    tx_types = meituan_df["platform_tx_type"].to_numpy()
+    amounts = meituan_df["amount"].to_numpy(dtype=float)
+    counterparties = meituan_df["counterparty"].to_numpy()
+    # Match state, updated as refunds are paired up
+    refunded = meituan_df["is_refunded"].to_numpy(dtype=bool).copy()
+    refund_amounts = meituan_df["refund_amount"].to_numpy(dtype=float).copy()
+
+    # Merchants repeat heavily, so extract keywords once per distinct
+    # counterparty and index by code — regex work scales with unique
+    # labels, not rows
+    cp_codes, cp_uniques = pd.factorize(counterparties)
+    keywords_per_label = [_extract_merchant_keywords(c) for c in cp_uniques]
+
+    # Build global index: keyword -> payment positions sorted by amount
+    # descending, so the candidates able to absorb a refund form a prefix
+    # that a binary search can delimit
     from collections import defaultdict
-    payment_index = defaultdict(list)
-
-    for idx, row in meituan_df.iterrows():
-        if row["platform_tx_type"] != "支付":
-            continue
-        keywords = _extract_merchant_keywords(row["counterparty"])
-        for kw in keywords:
-            payment_index[kw].append(idx)
+    buckets = defaultdict(list)
+
+    for pos in np.nonzero(tx_types == "支付")[0]:
+        for kw in keywords_per_label[cp_codes[pos]]:
+            buckets[kw].append(pos)
+
+    payment_index = {}
+    for kw, positions in buckets.items():
+        arr = np.array(sorted(positions, key=lambda p: -amounts[p]), dtype=np.int64)
+        payment_index[kw] = (arr, -amounts[arr])
+
+    # Deferred updates — the loop only touches local arrays/lists, and the
+    # DataFrame takes a handful of batched .loc writes at the end instead
+    # of per-cell df.at stores
+    refund_rows = []      # every refund row: is_ignored + track
+    unmatched_rows = []   # refund rows without a match: negative effective
+    unmatched_eff = []
+    matched_rows = []     # payment rows that absorbed a refund
+    matched_amt = []
+    matched_refund = []
 
     # Process refund rows
-    for idx, row in meituan_df.iterrows():
-        if row["platform_tx_type"] != "退款":
-            continue
-
-        refund_amount = row["amount"]
-        refund_keywords = _extract_merchant_keywords(row["counterparty"])
+    for pos in np.nonzero(tx_types == "退款")[0]:
+        refund_amount = amounts[pos]
+        refund_keywords = keywords_per_label[cp_codes[pos]]
 
         # Mark refund row as ignored
-        df.at[idx, "is_ignored"] = True
-        df.at[idx, "track"] = "refund_processed"
+        refund_rows.append(indices[pos])
 
         if not refund_keywords:
             # Coupon refunds — no matching payment expected
-            df.at[idx, "effective_amount"] = -refund_amount
+            unmatched_rows.append(indices[pos])
+            unmatched_eff.append(-refund_amount)
             continue
 
         # Search for matching payment across all keywords
         matched = False
         for kw in refund_keywords:
-            if kw not in payment_index:
+            entry = payment_index.get(kw)
+            if entry is None:
                 continue
 
-            candidates = payment_index[kw]
-            for candidate_idx in candidates:
-                candidate = df.loc[candidate_idx]
-
-                if candidate["is_refunded"]:
+            bucket, neg_amounts = entry
+            # Eligible candidates (amount >= refund) are the prefix up to
+            # this cutoff — everything after is too small to absorb it
+            cutoff = np.searchsorted(neg_amounts, -refund_amount, side="right")
+            for candidate_pos in bucket[:cutoff]:
+                if refunded[candidate_pos]:
                     continue  # Already matched
 
-                if refund_amount <= candidate["amount"]:
-                    # Match found — deduct from original
-                    df.at[candidate_idx, "is_refunded"] = True
-                    df.at[candidate_idx, "refund_amount"] += refund_amount
-                    df.at[candidate_idx, "effective_amount"] = max(
-                        0,
-                        candidate["amount"] - df.at[candidate_idx, "refund_amount"]
-                    )
-                    matched = True
-                    break
+                # Match found — deduct from original
+                refunded[candidate_pos] = True
+                refund_amounts[candidate_pos] += refund_amount
+                matched_rows.append(indices[candidate_pos])
+                matched_amt.append(amounts[candidate_pos])
+                matched_refund.append(refund_amounts[candidate_pos])
+                matched = True
+                break
 
             if matched:
                 break
 
         if not matched:
             # Unmatched refund — keep as negative effective_amount for natural offset
-            df.at[idx, "effective_amount"] = -refund_amount
+            unmatched_rows.append(indices[pos])
+            unmatched_eff.append(-refund_amount)
+
+    if refund_rows:
+        df.loc[refund_rows, "is_ignored"] = True
+        df.loc[refund_rows, "track"] = "refund_processed"
+    if unmatched_rows:
+        df.loc[unmatched_rows, "effective_amount"] = unmatched_eff
+    if matched_rows:
+        df.loc[matched_rows, "is_refunded"] = True
+        df.loc[matched_rows, "refund_amount"] = matched_refund
+        # Clamp once over the whole batch instead of scalar max() per match
+        df.loc[matched_rows, "effective_amount"] = np.maximum(
+            0.0, np.asarray(matched_amt) - np.asarray(matched_refund)
+        )
 
     return df
 
@@ -225,16 +293,27 @@ def apply_refund_netting(df: pd.DataFrame) -> pd.DataFrame:
     This modifies:
     - Original payment records: is_refunded, refund_amount, effective_amount
     - Refund income records: is_ignored = True, track = refund_processed
-    """
-    df = df.copy()
 
+    The input frame is mutated in place and returned — no defensive copy.
+    """
     # Ensure numeric columns
     df["refund_amount"] = df["refund_amount"].fillna(0).astype(float)
     df["effective_amount"] = df["effective_amount"].fillna(0).astype(float)
 
-    df = _net_alipay_refunds(df)
-    df = _net_wechat_refunds(df)
-    df = _net_jd_refunds(df)
-    df = _net_meituan_refunds(df)
+    # Low-cardinality string columns: as category, the equality masks in the
+    # _net_* helpers compare int8 codes instead of Python string objects
+    for col in ("source_platform", "direction", "platform_category", "platform_tx_type", "status"):
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    # Partition by platform once — each helper used to redo the same
+    # source_platform equality scan
+    sp = df["source_platform"]
+    platform_masks = {p: sp.eq(p) for p in ("alipay", "wechat", "jd", "meituan")}
+
+    df = _net_alipay_refunds(df, platform_masks["alipay"])
+    df = _net_wechat_refunds(df, platform_masks["wechat"])
+    df = _net_jd_refunds(df, platform_masks["jd"])
+    df = _net_meituan_refunds(df, platform_masks["meituan"])
 
     return df
@@ -6,10 +6,14 @@ Main entry point — orchestrates the full pipeline:
 import os
 import sys
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 from .parsers.alipay import parse_alipay
+from .parsers.base import unify_categoricals
 from .parsers.wechat import parse_wechat
 from .parsers.jd import parse_jd
 from .parsers.meituan import parse_meituan
@@ -33,10 +37,17 @@ def _parse_data_scope(data_path: Path, user_id: Optional[str] = None) -> list[pd
     dfs = []
     scope_label = f" [{user_id}]" if user_id else ""
 
-    # Alipay CSV files
-    for f in sorted(data_path.glob("支付宝*.csv")):
+    # Alipay CSV files — independent, so parse across cores when there is
+    # more than one (a single file isn't worth the process spawn overhead)
+    alipay_files = sorted(data_path.glob("支付宝*.csv"))
+    if len(alipay_files) > 1:
+        with ProcessPoolExecutor() as ex:
+            parsed = list(ex.map(parse_alipay, (str(f) for f in alipay_files)))
+    else:
+        parsed = [parse_alipay(str(f)) for f in alipay_files]
+    for f, df in zip(alipay_files, parsed):
         print(f"  → Alipay{scope_label}: {f.name}")
-        df = _apply_user_override(parse_alipay(str(f)), user_id)
+        df = _apply_user_override(df, user_id)
         print(f"    {len(df)} records parsed")
         dfs.append(df)
 
@@ -96,23 +107,27 @@ def run_pipeline(data_dir: str, output_dir: str = "output") -> pd.DataFrame:
         print("❌ No data files found in", data_dir)
         return pd.DataFrame()
 
-    all_data = pd.concat(dfs, ignore_index=True)
+    # Align category sets across the per-source frames so concat merges
+    # codes instead of falling back to object columns
+    all_data = pd.concat(unify_categoricals(dfs), ignore_index=True)
     print(f"  ✅ Total: {len(all_data)} records from {len(dfs)} source(s)")
 
     # ── Step 2: Refund Netting ───────────────────────────────────
     print("\n💰 Step 2: Refund netting...")
     all_data = apply_refund_netting(all_data)
 
-    refunded = all_data[all_data["is_refunded"]].shape[0]
-    ignored = all_data[all_data["is_ignored"]].shape[0]
+    # Counts via mask reductions — no need to slice the full frame just
+    # to read its length
+    refunded = int(all_data["is_refunded"].sum())
+    ignored = int(all_data["is_ignored"].sum())
     print(f"  ✅ {refunded} records have refunds, {ignored} refund rows ignored")
 
     # ── Step 3: Track Classification ─────────────────────────────
     print("\n🔀 Step 3: Track classification (consumption vs cashflow)...")
     all_data = apply_track_classification(all_data)
 
-    consumption = all_data[all_data["track"] == "consumption"].shape[0]
-    cashflow = all_data[all_data["track"] == "cashflow"].shape[0]
+    consumption = int((all_data["track"] == "consumption").sum())
+    cashflow = int((all_data["track"] == "cashflow").sum())
     print(f"  ✅ Consumption: {consumption} | Cashflow: {cashflow}")
 
     # ── Step 4: Tag Inheritance ───────────────────────────────────
@@ -120,8 +135,8 @@ def run_pipeline(data_dir: str, output_dir: str = "output") -> pd.DataFrame:
     print(f"\n🏷️  Step 4: Tag inheritance...")
     all_data = apply_tag_inheritance(all_data, overrides_file)
 
-    with_l1 = all_data[all_data["global_category_l1"].fillna("") != ""].shape[0]
-    with_l2 = all_data[all_data["global_category_l2"].fillna("") != ""].shape[0]
+    with_l1 = int((all_data["global_category_l1"].fillna("") != "").sum())
+    with_l2 = int((all_data["global_category_l2"].fillna("") != "").sum())
     print(f"  ✅ {with_l1} records have L1, {with_l2} have L2 (inherited)")
 
     # ── Step 5: Generate LLM Tagging Batches ─────────────────────
@@ -131,10 +146,25 @@ def run_pipeline(data_dir: str, output_dir: str = "output") -> pd.DataFrame:
     print(f"  ✅ {len(batches)} batch files generated in {tagging_dir}")
 
     # ── Step 6: Save processed data ──────────────────────────────
-    # Save as CSV for inspection
+    # Save as CSV for inspection — pyarrow's multithreaded writer instead
+    # of the Python-level to_csv. Timestamps are cast to second resolution
+    # so they serialize as "YYYY-MM-DD HH:MM:SS" like before, and the BOM
+    # is written by hand since arrow has no utf-8-sig mode
     data_file = output_path / "processed_data.csv"
-    all_data.to_csv(str(data_file), index=False, encoding="utf-8-sig")
-    print(f"\n💾 Processed data saved to {data_file}")
+    table = pa.Table.from_pandas(all_data, preserve_index=False)
+    ts_idx = table.schema.get_field_index("timestamp")
+    table = table.set_column(
+        ts_idx, "timestamp", table.column("timestamp").cast(pa.timestamp("s"))
+    )
+    with open(data_file, "wb") as f:
+        f.write(b"\xef\xbb\xbf")
+        pacsv.write_csv(table, f)
+
+    # Also save as Parquet — the API prefers it (dtypes survive, so the
+    # loader can skip re-parsing timestamps and re-casting columns)
+    parquet_file = output_path / "processed_data.parquet"
+    all_data.to_parquet(str(parquet_file), engine="pyarrow", compression="zstd")
+    print(f"\n💾 Processed data saved to {data_file} (+ {parquet_file.name})")
 
     # Update tag_overrides with any newly tagged records for future reruns
     count = export_tag_overrides(all_data, overrides_file)
@@ -164,26 +194,29 @@ def run_pipeline(data_dir: str, output_dir: str = "output") -> pd.DataFrame:
                 .agg(["sum", "count"])
                 .sort_values("sum", ascending=False)
             )
-            for cat, row in l1_summary.iterrows():
+            for cat, cat_sum, cat_count in l1_summary.itertuples(name=None):
                 if cat:
-                    pct = row["sum"] / total_spend * 100 if total_spend > 0 else 0
-                    print(f"     {cat:12s}  ¥{row['sum']:>10,.2f}  ({row['count']:>3.0f}笔, {pct:>5.1f}%)")
+                    pct = cat_sum / total_spend * 100 if total_spend > 0 else 0
+                    print(f"     {cat:12s}  ¥{cat_sum:>10,.2f}  ({cat_count:>3.0f}笔, {pct:>5.1f}%)")
 
-    # Cashflow track stats
-    cashflow_df = all_data[all_data["track"] == "cashflow"]
+    # Cashflow track stats — a mask sum, no need to slice the frame
     print(f"\n💸 Cashflow Track:")
-    print(f"   Records:  {len(cashflow_df)}")
+    print(f"   Records:  {int((all_data['track'] == 'cashflow').sum())}")
 
-    # By platform
+    # By platform — one grouped aggregation instead of re-slicing
+    # all_data twice per platform
     print(f"\n📱 By Platform:")
-    for platform in all_data["source_platform"].unique():
-        p_df = all_data[all_data["source_platform"] == platform]
-        p_cons = p_df[p_df["track"] == "consumption"]
-        print(f"   {platform}: {len(p_df)} total, {len(p_cons)} consumption")
+    by_platform = (
+        all_data["track"].eq("consumption")
+        .groupby(all_data["source_platform"], observed=True)
+        .agg(["size", "sum"])
+    )
+    for platform, total, cons_count in by_platform.itertuples(name=None):
+        print(f"   {platform}: {total} total, {int(cons_count)} consumption")
 
     # Pending LLM tagging
-    needs_l2 = consumption_df[consumption_df["global_category_l2"].fillna("") == ""]
-    print(f"\n⏳ Awaiting LLM L2 tagging: {len(needs_l2)} records ({len(batches)} batches)")
+    needs_l2 = int((consumption_df["global_category_l2"].fillna("") == "").sum())
+    print(f"\n⏳ Awaiting LLM L2 tagging: {needs_l2} records ({len(batches)} batches)")
 
     return all_data
 
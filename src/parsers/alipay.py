@@ -12,20 +12,48 @@ import re
 from typing import Optional, List
 import pandas as pd
 from pathlib import Path
-from .base import UUL_COLUMNS, create_empty_uul
+from .base import (
+    ARROW_STRING_COLS,
+    CATEGORICAL_COLS,
+    STRING_DTYPE,
+    UUL_COLUMNS,
+    create_empty_uul,
+    parse_timestamps,
+    read_csv_rows,
+)
 from ..users import identify_user
 
 
+def _try_decode(head: bytes, encoding: str, char_width: int) -> bool:
+    """True if `head` decodes cleanly, ignoring a truncated final character."""
+    try:
+        head.decode(encoding)
+        return True
+    except UnicodeDecodeError as e:
+        # The probe may cut a multi-byte sequence at the end — that
+        # doesn't disqualify the encoding
+        return e.start >= len(head) - char_width
+
+
 def _detect_encoding(filepath: str) -> str:
-    """Detect file encoding, trying GB2312/GBK first."""
-    for enc in ["gb2312", "gbk", "utf-8-sig", "utf-8"]:
-        try:
-            with open(filepath, "r", encoding=enc) as f:
-                f.read(2000)
-            return enc
-        except (UnicodeDecodeError, LookupError):
-            continue
-    return "utf-8"
+    """
+    Detect file encoding from a single 4 KB byte probe.
+
+    One binary read replaces the old loop that reopened and re-decoded
+    the file once per candidate encoding.
+    """
+    with open(filepath, "rb") as f:
+        head = f.read(4096)
+
+    if head.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    # GB2312 high bytes almost never form valid UTF-8 sequences, so a
+    # clean UTF-8 decode is decisive
+    if _try_decode(head, "utf-8", 4):
+        return "utf-8"
+    if _try_decode(head, "gb2312", 2):
+        return "gb2312"
+    return "gbk"
 
 
 def _parse_metadata(lines: List[str]) -> dict:
@@ -41,6 +69,10 @@ def _parse_metadata(lines: List[str]) -> dict:
             m = re.search(r"支付宝账户[：:]\s*(\S+)", line)
             if m:
                 metadata["account"] = m.group(1).strip()
+        # Both fields sit near the top of the prologue — stop scanning
+        # (and regex-matching) the remaining disclaimer lines
+        if "name" in metadata and "account" in metadata:
+            break
     return metadata
 
 
@@ -72,98 +104,99 @@ def parse_alipay(filepath: str) -> pd.DataFrame:
     """
     encoding = _detect_encoding(filepath)
 
+    # Stream the metadata prologue line-by-line, stop at the header row
+    # (contains "交易时间"), and pull the data block in one read — no
+    # per-line list for the whole file
+    prologue = []
+    data_text = None
     with open(filepath, "r", encoding=encoding, errors="replace") as f:
-        all_lines = f.readlines()
+        for line in f:
+            if "交易时间" in line and "交易对方" in line:
+                data_text = f.read()
+                break
+            prologue.append(line)
+
+    if data_text is None:
+        raise ValueError(f"Cannot find header row in {filepath}")
 
     # Extract metadata for user identification
-    metadata = _parse_metadata(all_lines)
+    metadata = _parse_metadata(prologue)
     user_id = identify_user(
         name=metadata.get("name"),
         account=metadata.get("account"),
     )
 
-    # Find header line (contains "交易时间")
-    header_idx = None
-    for i, line in enumerate(all_lines):
-        if "交易时间" in line and "交易对方" in line:
-            header_idx = i
-            break
-
-    if header_idx is None:
-        raise ValueError(f"Cannot find header row in {filepath}")
-
-    # Parse data lines
-    records = []
-    for line in all_lines[header_idx + 1 :]:
-        line = line.strip().rstrip(",")
-        if not line or line.startswith("-"):
-            continue
-
-        parts = line.split(",")
-        if len(parts) < 11:
-            continue
-
-        # Extract fields
-        timestamp_str = parts[0].strip()
-        platform_category = parts[1].strip()
-        counterparty = parts[2].strip()
-        # parts[3] = 对方账号 (skip)
-        description = parts[4].strip()
-        direction = parts[5].strip()
-        amount_str = parts[6].strip()
-        payment_method = parts[7].strip()
-        status = parts[8].strip()
-        tx_id = parts[9].strip()
-        merchant_order_id = parts[10].strip()
-        note = parts[11].strip() if len(parts) > 11 else ""
-
-        # Parse amount
-        try:
-            amount = float(amount_str)
-        except ValueError:
-            continue
-
-        # Parse timestamp
-        try:
-            timestamp = pd.to_datetime(timestamp_str)
-        except Exception:
-            continue
-
-        # Determine original tx ID for refunds
-        original_tx_id = ""
-        if status == "退款成功":
-            orig = _extract_refund_original_id(tx_id)
-            if orig:
-                original_tx_id = orig
-
-        records.append({
-            "source_platform": "alipay",
-            "user_id": user_id,
-            "transaction_id": tx_id,
-            "timestamp": timestamp,
-            "direction": direction,
-            "amount": amount,
-            "counterparty": counterparty,
-            "description": description,
-            "payment_method": payment_method,
-            "status": status,
-            "platform_category": platform_category,
-            "platform_tx_type": "",  # Alipay doesn't have this
-            "original_tx_id": original_tx_id,
-            "merchant_order_id": merchant_order_id,
-            "note": note,
-            # Defaults — will be filled by downstream modules
-            "track": "",
-            "is_refunded": False,
-            "refund_amount": 0.0,
-            "effective_amount": amount,
-            "is_ignored": False,
-            "global_category_l1": "",
-            "global_category_l2": "",
-        })
-
-    if not records:
+    # Bulk-parse the data block with pyarrow, then derive every UUL column
+    # vectorized. Column layout: 交易时间, 交易分类, 交易对方, 对方账号,
+    # 商品说明, 收/支, 金额, 收/付款方式, 交易状态, 交易订单号, 商家订单号,
+    # 备注 (plus a trailing empty field from the export's trailing comma)
+    raw = read_csv_rows(data_text)
+    if raw.empty or raw.shape[1] < 11:
         return create_empty_uul()
 
-    df = pd.DataFrame(records, columns=UUL_COLUMNS)
+    timestamp_str = raw.iloc[:, 0].str.strip()
+    platform_category = raw.iloc[:, 1].str.strip()
+    counterparty = raw.iloc[:, 2].str.strip()
+    description = raw.iloc[:, 4].str.strip()
+    direction = raw.iloc[:, 5].str.strip()
+    amount = pd.to_numeric(raw.iloc[:, 6].str.strip(), errors="coerce")
+    payment_method = raw.iloc[:, 7].str.strip()
+    status = raw.iloc[:, 8].str.strip()
+    tx_id = raw.iloc[:, 9].str.strip()
+    merchant_order_id = raw.iloc[:, 10].str.strip()
+    if raw.shape[1] > 11:
+        note = raw.iloc[:, 11].str.strip()
+    else:
+        note = pd.Series("", index=raw.index)
+
+    # One vectorized to_datetime over all rows; rows with an unparseable
+    # timestamp or amount are dropped below, as the old per-row loop did
+    ts = parse_timestamps(timestamp_str)
+
+    # Determine original tx ID for refund rows only
+    original_tx_id = pd.Series("", index=raw.index)
+    refund_rows = status.eq("退款成功")
+    if refund_rows.any():
+        original_tx_id.loc[refund_rows] = tx_id[refund_rows].map(
+            lambda t: _extract_refund_original_id(t) or ""
+        )
+
+    df = pd.DataFrame({
+        "source_platform": "alipay",
+        "user_id": user_id,
+        "transaction_id": tx_id,
+        "timestamp": ts,
+        "direction": direction,
+        "amount": amount,
+        "counterparty": counterparty,
+        "description": description,
+        "payment_method": payment_method,
+        "status": status,
+        "platform_category": platform_category,
+        "platform_tx_type": "",  # Alipay doesn't have this
+        "original_tx_id": original_tx_id,
+        "merchant_order_id": merchant_order_id,
+        "note": note,
+        # Defaults — will be filled by downstream modules
+        "track": "",
+        "is_refunded": False,
+        "refund_amount": 0.0,
+        "effective_amount": amount,
+        "is_ignored": False,
+        "global_category_l1": "",
+        "global_category_l2": "",
+    }, columns=UUL_COLUMNS)
+
+    # Low-cardinality strings as category, free text as Arrow strings —
+    # cheap to concat and to scan downstream
+    for col in CATEGORICAL_COLS:
+        df[col] = df[col].astype("category")
+    for col in ARROW_STRING_COLS:
+        df[col] = df[col].astype(STRING_DTYPE)
+
+    valid = ts.notna() & amount.notna()
+    if not valid.all():
+        df = df.loc[valid.to_numpy()].reset_index(drop=True)
+        if df.empty:
+            return create_empty_uul()
     return df
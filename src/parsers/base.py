@@ -4,7 +4,12 @@ UUL (Unified Universal Ledger) Schema — 统一标准账单数据模型
 All platform parsers output DataFrames conforming to this schema.
 """
 
+import csv
+import io
+
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 
 # Column definitions for the UUL DataFrame
 UUL_COLUMNS = [
@@ -33,36 +38,148 @@ UUL_COLUMNS = [
 ]
 
 
+# Low-cardinality string columns every parser emits as category dtype —
+# concatenating them merges int codes instead of copying Python strings,
+# and the downstream cleaners compare codes directly. `track` stays plain:
+# the cleaners assign labels the parsers never produce.
+CATEGORICAL_COLS = [
+    "source_platform",
+    "user_id",
+    "direction",
+    "status",
+    "payment_method",
+    "platform_category",
+    "platform_tx_type",
+]
+
+
+# Free-text columns held as Arrow-backed strings — contiguous buffers
+# instead of one heap-allocated Python str per cell, and the cleaners'
+# str.contains/str.extract calls run on Arrow kernels. `track` stays
+# plain for the same reason it isn't categorical.
+STRING_DTYPE = pd.ArrowDtype(pa.string())
+ARROW_STRING_COLS = [
+    "transaction_id",
+    "counterparty",
+    "description",
+    "original_tx_id",
+    "merchant_order_id",
+    "note",
+    "global_category_l1",
+    "global_category_l2",
+]
+
+
+def unify_categoricals(dfs: list) -> list:
+    """
+    Re-cast each frame's categorical columns onto shared union categories.
+
+    pd.concat silently falls back to object dtype when category sets
+    differ between frames — run this on the list right before concat.
+    """
+    from pandas.api.types import union_categoricals
+
+    # Empty frames (e.g. a header-only quarterly export) carry empty
+    # object-dtype categories that union_categoricals refuses to merge
+    # with the str-dtype categories of populated frames — and they add
+    # no rows anyway, so drop them before the union
+    dfs = [df for df in dfs if len(df)]
+    if not dfs:
+        return [create_empty_uul()]
+
+    for col in CATEGORICAL_COLS:
+        cols = [
+            df[col] if isinstance(df[col].dtype, pd.CategoricalDtype)
+            else df[col].astype("category")
+            for df in dfs
+        ]
+        union = union_categoricals([pd.Categorical(c) for c in cols])
+        for df, c in zip(dfs, cols):
+            df[col] = c.cat.set_categories(union.categories)
+    return dfs
+
+
 def create_empty_uul() -> pd.DataFrame:
     """Create an empty DataFrame with UUL schema."""
     df = pd.DataFrame(columns=UUL_COLUMNS)
-    # Set dtypes
+    # Set dtypes — matching the populated parser output so empty frames
+    # concat with typed ones without falling back to object
     df = df.astype({
-        "source_platform": "object",
-        "user_id": "object",
-        "transaction_id": "object",
-        "direction": "object",
+        "source_platform": "category",
+        "user_id": "category",
+        "transaction_id": STRING_DTYPE,
+        "direction": "category",
         "amount": "float64",
-        "counterparty": "object",
-        "description": "object",
-        "payment_method": "object",
-        "status": "object",
-        "platform_category": "object",
-        "platform_tx_type": "object",
-        "original_tx_id": "object",
-        "merchant_order_id": "object",
-        "note": "object",
+        "counterparty": STRING_DTYPE,
+        "description": STRING_DTYPE,
+        "payment_method": "category",
+        "status": "category",
+        "platform_category": "category",
+        "platform_tx_type": "category",
+        "original_tx_id": STRING_DTYPE,
+        "merchant_order_id": STRING_DTYPE,
+        "note": STRING_DTYPE,
         "track": "object",
         "is_refunded": "bool",
         "refund_amount": "float64",
         "effective_amount": "float64",
         "is_ignored": "bool",
-        "global_category_l1": "object",
-        "global_category_l2": "object",
+        "global_category_l1": STRING_DTYPE,
+        "global_category_l2": STRING_DTYPE,
     })
     return df
 
 
+def read_csv_rows(text: str) -> pd.DataFrame:
+    """
+    Bulk-parse CSV data lines with pyarrow's multithreaded C++ reader.
+
+    `text` is the file content after the metadata/header prologue (no
+    header row) — the caller has already decoded it, so non-UTF-8 exports
+    are recoded here on the way in. Every field comes back as a string
+    column named positionally f0, f1, ...; type inference is disabled so
+    long transaction ids and zero-padded amounts survive untouched. Rows
+    whose field count differs from the first row are dropped, like the
+    old per-line `len(parts)` checks.
+    """
+    if not text.strip():
+        return pd.DataFrame()
+
+    # Field count of the first row (csv-aware — quoted cells may hold commas)
+    first_row = next(csv.reader(io.StringIO(text)))
+    ncols = len(first_row)
+
+    table = pa_csv.read_csv(
+        io.BytesIO(text.encode("utf-8")),
+        read_options=pa_csv.ReadOptions(autogenerate_column_names=True),
+        parse_options=pa_csv.ParseOptions(
+            newlines_in_values=True,
+            invalid_row_handler=lambda row: "skip",
+        ),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={f"f{i}": pa.string() for i in range(ncols)},
+        ),
+    )
+    return table.to_pandas()
+
+
+def parse_timestamps(values) -> pd.Series:
+    """
+    Parse a list of timestamp strings in one vectorized call.
+
+    All four platforms export "YYYY-MM-DD HH:MM:SS", so that format is
+    tried first (skipping per-element format inference); any stragglers
+    get a per-element fallback pass. Unparseable values come back as NaT
+    for the caller to drop.
+    """
+    raw = pd.Series(values, dtype="object")
+    ts = pd.to_datetime(raw, format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    missing = ts.isna()
+    if missing.any():
+        ts[missing] = pd.to_datetime(raw[missing], format="mixed", errors="coerce")
+    return ts
+
+
 def validate_uul(df: pd.DataFrame) -> None:
     """Validate that a DataFrame conforms to UUL schema."""
     missing = set(UUL_COLUMNS) - set(df.columns)
@@ -15,24 +15,21 @@ Special handling:
   - File names: 美团账单(YYYYMMDD-YYYYMMDD).csv, multiple quarterly files
 """
 
-import re
-import csv
-import io
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from .base import UUL_COLUMNS, create_empty_uul
+from .base import (
+    ARROW_STRING_COLS,
+    CATEGORICAL_COLS,
+    STRING_DTYPE,
+    UUL_COLUMNS,
+    create_empty_uul,
+    parse_timestamps,
+    read_csv_rows,
+)
 from ..users import identify_user
 
 
-def _strip_yen(val: str) -> float:
-    """Remove ¥ prefix and parse as float."""
-    val = val.strip().lstrip("¥").strip()
-    try:
-        return float(val)
-    except ValueError:
-        return 0.0
-
-
 def parse_meituan(filepath: str) -> pd.DataFrame:
     """
     Parse a Meituan CSV file into UUL format.
@@ -43,106 +40,100 @@ def parse_meituan(filepath: str) -> pd.DataFrame:
     Returns:
         DataFrame conforming to UUL schema
     """
-    # Meituan exports as UTF-8 with BOM
+    # Meituan exports as UTF-8 with BOM. Stream until the marker line
+    # "【美团交易账单明细列表】", skip the header row right after it, then
+    # pull the data block in one read — no per-line list for the whole file
+    data_text = None
     with open(filepath, "r", encoding="utf-8-sig", errors="replace") as f:
-        all_lines = f.readlines()
+        for line in f:
+            if "【美团交易账单明细列表】" in line:
+                next(f, None)  # header row
+                data_text = f.read()
+                break
 
-    # Find the marker line "【美团交易账单明细列表】"
-    marker_idx = None
-    for i, line in enumerate(all_lines):
-        if "【美团交易账单明细列表】" in line:
-            marker_idx = i
-            break
-
-    if marker_idx is None:
+    if data_text is None:
         raise ValueError(f"Cannot find 【美团交易账单明细列表】 marker in {filepath}")
 
-    # Header is the line right after the marker
-    header_idx = marker_idx + 1
-
     # User identification — default to "parko"
     user_id = "parko"
 
-    # Join remaining lines and parse as CSV (handles quoted fields properly)
-    data_text = "".join(all_lines[header_idx:])
-    reader = csv.reader(io.StringIO(data_text))
-
-    # Read header row
-    try:
-        header = next(reader)
-        header = [h.strip() for h in header]
-    except StopIteration:
-        return create_empty_uul()
-
-    records = []
-    for row in reader:
-        if len(row) < 11:
-            continue
-
-        # Strip all fields
-        row = [cell.strip() for cell in row]
-
-        create_time = row[0]
-        success_time = row[1]
-        tx_type = row[2]           # 支付 / 退款 / 还款
-        order_title = row[3]
-        direction = row[4]         # 支出 / 收入
-        payment_method = row[5]
-        order_amount = _strip_yen(row[6])
-        actual_amount = _strip_yen(row[7])
-        tx_id = row[8]
-        merchant_order_id = row[9]
-        note = row[10] if len(row) > 10 else ""
-
-        # Use the success time as timestamp, fall back to create time
-        timestamp_str = success_time if success_time else create_time
-        try:
-            timestamp = pd.to_datetime(timestamp_str)
-        except Exception:
-            continue
-
-        # For Meituan, we use actual_amount as the primary amount
-        amount = actual_amount
-
-        # Determine if this is a refund row
-        is_refund_row = (tx_type == "退款")
-
-        # Map direction for refund rows
-        if is_refund_row:
-            direction_mapped = "收入"
-        elif tx_type == "还款":
-            direction_mapped = "不计收支"
-        else:
-            direction_mapped = direction
-
-        records.append({
-            "source_platform": "meituan",
-            "user_id": user_id,
-            "transaction_id": tx_id,
-            "timestamp": timestamp,
-            "direction": direction_mapped,
-            "amount": amount,
-            "counterparty": order_title,  # Meituan uses order title as counterparty
-            "description": order_title,
-            "payment_method": payment_method,
-            "status": tx_type,  # Store tx_type as status (支付/退款/还款)
-            "platform_category": "",  # Meituan has no category
-            "platform_tx_type": tx_type,
-            "original_tx_id": "",
-            "merchant_order_id": merchant_order_id,
-            "note": note,
-            # Defaults — will be refined by downstream modules
-            "track": "",
-            "is_refunded": False,
-            "refund_amount": 0.0,
-            "effective_amount": amount,
-            "is_ignored": False,  # Will be set by refund netting
-            "global_category_l1": "",
-            "global_category_l2": "",
-        })
-
-    if not records:
+    # Bulk-parse the data block with pyarrow (handles quoted fields), then
+    # derive every UUL column vectorized. Column layout: 创建时间, 成功时间,
+    # 交易类型, 订单标题, 收/支, 支付方式, 订单金额, 实付金额, 交易单号,
+    # 商家订单号, 备注
+    raw = read_csv_rows(data_text)
+    if raw.empty or raw.shape[1] < 11:
         return create_empty_uul()
 
-    df = pd.DataFrame(records, columns=UUL_COLUMNS)
+    # Strip all fields
+    create_time = raw.iloc[:, 0].str.strip()
+    success_time = raw.iloc[:, 1].str.strip()
+    tx_type = raw.iloc[:, 2].str.strip()       # 支付 / 退款 / 还款
+    order_title = raw.iloc[:, 3].str.strip()
+    direction = raw.iloc[:, 4].str.strip()     # 支出 / 收入
+    payment_method = raw.iloc[:, 5].str.strip()
+    # For Meituan, the actual amount (实付金额) is the primary amount;
+    # strip the ¥ prefix and parse the whole column at once
+    amount = pd.to_numeric(
+        raw.iloc[:, 7].str.strip().str.lstrip("¥").str.strip(), errors="coerce"
+    ).fillna(0.0)
+    tx_id = raw.iloc[:, 8].str.strip()
+    merchant_order_id = raw.iloc[:, 9].str.strip()
+    note = raw.iloc[:, 10].str.strip()
+
+    # Use the success time as timestamp, fall back to create time, then
+    # one vectorized to_datetime; rows that fail to parse are dropped below
+    ts = parse_timestamps(success_time.where(success_time != "", create_time))
+
+    # Refund rows count as income, 还款 (月付代扣) as neutral — one
+    # np.select sweep instead of two masked assignments
+    direction_mapped = pd.Series(
+        np.select(
+            [tx_type.eq("退款"), tx_type.eq("还款")],
+            ["收入", "不计收支"],
+            default=direction,
+        ),
+        index=direction.index,
+    )
+
+    # Meituan uses the order title as both counterparty and description,
+    # and stores tx_type (支付/退款/还款) as both status and platform_tx_type
+    df = pd.DataFrame({
+        "source_platform": "meituan",
+        "user_id": user_id,
+        "transaction_id": tx_id,
+        "timestamp": ts,
+        "direction": direction_mapped,
+        "amount": amount,
+        "counterparty": order_title,
+        "description": order_title,
+        "payment_method": payment_method,
+        "status": tx_type,
+        "platform_category": "",  # Meituan has no category
+        "platform_tx_type": tx_type,
+        "original_tx_id": "",
+        "merchant_order_id": merchant_order_id,
+        "note": note,
+        # Defaults — will be refined by downstream modules
+        "track": "",
+        "is_refunded": False,
+        "refund_amount": 0.0,
+        "effective_amount": amount,
+        "is_ignored": False,  # Will be set by refund netting
+        "global_category_l1": "",
+        "global_category_l2": "",
+    }, columns=UUL_COLUMNS)
+
+    # Low-cardinality strings as category, free text as Arrow strings —
+    # cheap to concat and to scan downstream
+    for col in CATEGORICAL_COLS:
+        df[col] = df[col].astype("category")
+    for col in ARROW_STRING_COLS:
+        df[col] = df[col].astype(STRING_DTYPE)
+
+    valid = ts.notna()
+    if not valid.all():
+        df = df.loc[valid.to_numpy()].reset_index(drop=True)
+        if df.empty:
+            return create_empty_uul()
     return df
@@ -14,11 +14,27 @@ and merges them into a single UUL DataFrame.
 import re
 import glob
 import openpyxl
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from .base import UUL_COLUMNS, create_empty_uul
+from .base import (
+    ARROW_STRING_COLS,
+    CATEGORICAL_COLS,
+    STRING_DTYPE,
+    UUL_COLUMNS,
+    create_empty_uul,
+    parse_timestamps,
+    unify_categoricals,
+)
 from ..users import identify_user
 
+try:
+    # Rust-backed XLSX parser, much faster than openpyxl's XML walk
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
 
 def _parse_metadata_from_rows(rows: list) -> dict:
     """Extract user nickname from XLSX header rows."""
@@ -29,45 +45,13 @@ def _parse_metadata_from_rows(rows: list) -> dict:
         m = re.search(r"微信昵称[：:]\s*\[?([^\]]+)\]?", cell)
         if m:
             metadata["name"] = m.group(1).strip()
+            break  # nickname is the only field — stop scanning
     return metadata
 
 
-def _clean_amount(amount_str: str) -> float:
-    """Remove ¥ prefix and parse amount."""
-    if not amount_str:
-        return 0.0
-    s = str(amount_str).replace("¥", "").replace("￥", "").strip()
-    try:
-        return float(s)
-    except ValueError:
-        return 0.0
-
-
-def _parse_refund_from_status(status: str) -> tuple[bool, float]:
-    """
-    Parse refund info from WeChat's '当前状态' field.
-
-    Returns:
-        (is_refunded, refund_amount)
-
-    Examples:
-        "已全额退款" -> (True, -1)  # -1 means full refund (use original amount)
-        "已退款(￥14.00)" -> (True, 14.0)
-        "已退款￥14.00" -> (True, 14.0)
-        "支付成功" -> (False, 0)
-    """
-    if not status:
-        return False, 0.0
-
-    if "已全额退款" in status:
-        return True, -1.0  # sentinel: full refund
-
-    # Match patterns like "已退款(￥14.00)" or "已退款￥14.00"
-    m = re.search(r"已退款[（(]?[¥￥]?([\d.]+)[）)]?", status)
-    if m:
-        return True, float(m.group(1))
-
-    return False, 0.0
+# Partial refund amounts in the '当前状态' field, e.g. "已退款(￥14.00)"
+# or "已退款￥14.00"; "已全额退款" means the full amount was returned
+_RE_STATUS_REFUND = re.compile(r"已退款[（(]?[¥￥]?([\d.]+)[）)]?")
 
 
 def parse_wechat_file(filepath: str) -> tuple[pd.DataFrame, str]:
@@ -77,10 +61,19 @@ def parse_wechat_file(filepath: str) -> tuple[pd.DataFrame, str]:
     Returns:
         (DataFrame, user_id)
     """
-    wb = openpyxl.load_workbook(filepath, read_only=True)
-    ws = wb.active
-    all_rows = list(ws.iter_rows(values_only=True))
-    wb.close()
+    if CalamineWorkbook is not None:
+        # calamine trims trailing empty cells per row — pad back to the
+        # 11 columns the data rows use
+        sheet = CalamineWorkbook.from_path(filepath).get_sheet_by_index(0)
+        all_rows = [
+            row if len(row) >= 11 else row + [None] * (11 - len(row))
+            for row in sheet.to_python()
+        ]
+    else:
+        wb = openpyxl.load_workbook(filepath, read_only=True)
+        ws = wb.active
+        all_rows = list(ws.iter_rows(values_only=True))
+        wb.close()
 
     # Extract metadata
     metadata = _parse_metadata_from_rows(all_rows)
@@ -96,80 +89,107 @@ def parse_wechat_file(filepath: str) -> tuple[pd.DataFrame, str]:
     if header_idx is None:
         raise ValueError(f"Cannot find header row in {filepath}")
 
-    # Parse data rows
-    records = []
-    for row in all_rows[header_idx + 1 :]:
-        if row[0] is None:
-            continue
-
-        timestamp_str = str(row[0]).strip()
-        tx_type = str(row[1]).strip() if row[1] else ""
-        counterparty = str(row[2]).strip() if row[2] else ""
-        description = str(row[3]).strip() if row[3] else ""
-        direction = str(row[4]).strip() if row[4] else ""
-        amount = _clean_amount(row[5])
-        payment_method = str(row[6]).strip() if row[6] else ""
-        status = str(row[7]).strip() if row[7] else ""
-        tx_id = str(row[8]).strip() if row[8] else ""
-        merchant_order_id = str(row[9]).strip() if row[9] else ""
-        note = str(row[10]).strip() if row[10] else ""
-
-        # Handle None/empty merchant order
-        if merchant_order_id == "None":
-            merchant_order_id = ""
-
-        # Parse timestamp
-        try:
-            timestamp = pd.to_datetime(timestamp_str)
-        except Exception:
-            continue
-
-        # Direction: WeChat uses "/" for neutral transactions
-        if direction == "/":
-            direction = "中性"
-
-        # Check refund status on original payment records
-        is_refunded, refund_amt = _parse_refund_from_status(status)
-        if is_refunded:
-            if refund_amt == -1.0:
-                # Full refund
-                refund_amt = amount
-            effective = amount - refund_amt
-        else:
-            effective = amount
-
-        # Determine if this row is a refund income (XXX-退款)
-        is_refund_income = "退款" in tx_type and direction == "收入"
-
-        records.append({
-            "source_platform": "wechat",
-            "user_id": user_id,
-            "transaction_id": tx_id,
-            "timestamp": timestamp,
-            "direction": direction,
-            "amount": amount,
-            "counterparty": counterparty,
-            "description": description,
-            "payment_method": payment_method,
-            "status": status,
-            "platform_category": "",  # WeChat has NO category
-            "platform_tx_type": tx_type,
-            "original_tx_id": "",  # WeChat doesn't provide this directly
-            "merchant_order_id": merchant_order_id,
-            "note": note,
-            "track": "",
-            "is_refunded": is_refunded,
-            "refund_amount": refund_amt if is_refunded else 0.0,
-            "effective_amount": effective,
-            "is_ignored": is_refund_income,
-            "global_category_l1": "",
-            "global_category_l2": "",
-        })
-
-    if not records:
+    # Load the data block into a frame and derive every field column-wise
+    # — one str conversion + strip kernel per column instead of N×11
+    # per-row `str(row[i]).strip() if row[i] else ""` expressions
+    raw = pd.DataFrame(all_rows[header_idx + 1 :])
+    if raw.empty or raw.shape[1] < 11:
+        return create_empty_uul(), user_id
+
+    # openpyxl yields None for empty cells, calamine yields "" — both
+    # falsy, so astype(bool) drops the blank rows in one pass
+    raw = raw[raw.iloc[:, 0].astype(bool)].reset_index(drop=True)
+    n = len(raw)
+    if n == 0:
         return create_empty_uul(), user_id
 
-    df = pd.DataFrame(records, columns=UUL_COLUMNS)
+    def _text(col: pd.Series) -> pd.Series:
+        return col.fillna("").astype(str).str.strip()
+
+    timestamps = _text(raw.iloc[:, 0])
+    tx_types = _text(raw.iloc[:, 1])
+    counterparties = _text(raw.iloc[:, 2])
+    descriptions = _text(raw.iloc[:, 3])
+    directions = _text(raw.iloc[:, 4])
+    payment_methods = _text(raw.iloc[:, 6])
+    statuses = _text(raw.iloc[:, 7])
+    tx_ids = _text(raw.iloc[:, 8])
+    merchant_order_ids = _text(raw.iloc[:, 9])
+    notes = _text(raw.iloc[:, 10])
+
+    # Strip the ¥ prefix and parse the whole amount column at once;
+    # unparseable cells become 0.0, as _clean_amount did per row
+    amounts = pd.to_numeric(
+        _text(raw.iloc[:, 5]).str.replace("¥", "").str.replace("￥", "").str.strip(),
+        errors="coerce",
+    ).fillna(0.0).to_numpy()
+
+    # Handle None/empty merchant order (openpyxl stringifies None cells)
+    merchant_order_ids = merchant_order_ids.mask(merchant_order_ids == "None", "")
+
+    # Direction: WeChat uses "/" for neutral transactions
+    directions = directions.mask(directions == "/", "中性")
+
+    # Refund status on original payment records, vectorized: one
+    # str.extract pass over the whole status column instead of a
+    # re.search per row. "已全额退款" refunds the full amount; partial
+    # refunds carry the amount inline
+    full_refund = statuses.str.contains("已全额退款", regex=False)
+    partial_amt = pd.to_numeric(
+        statuses.str.extract(_RE_STATUS_REFUND, expand=False), errors="coerce"
+    )
+    refunded_flags = (full_refund | partial_amt.notna()).to_numpy()
+    refund_amounts = np.where(full_refund, amounts, partial_amt.fillna(0.0))
+    effective_amounts = amounts - refund_amounts
+
+    # Refund income rows (交易类型 = 'XXX-退款') don't count as spending
+    ignored_flags = (
+        tx_types.str.contains("退款", regex=False) & (directions == "收入")
+    ).to_numpy()
+
+    # One vectorized to_datetime over all rows; unparseable timestamps
+    # become NaT and those rows are dropped below, matching the old
+    # per-row try/except
+    ts = parse_timestamps(timestamps)
+
+    # Constant and default columns are built in one shot
+    df = pd.DataFrame({
+        "source_platform": ["wechat"] * n,
+        "user_id": [user_id] * n,
+        "transaction_id": tx_ids,
+        "timestamp": ts,
+        "direction": directions,
+        "amount": amounts,
+        "counterparty": counterparties,
+        "description": descriptions,
+        "payment_method": payment_methods,
+        "status": statuses,
+        "platform_category": [""] * n,  # WeChat has NO category
+        "platform_tx_type": tx_types,
+        "original_tx_id": [""] * n,  # WeChat doesn't provide this directly
+        "merchant_order_id": merchant_order_ids,
+        "note": notes,
+        "track": [""] * n,
+        "is_refunded": refunded_flags,
+        "refund_amount": refund_amounts,
+        "effective_amount": effective_amounts,
+        "is_ignored": ignored_flags,
+        "global_category_l1": [""] * n,
+        "global_category_l2": [""] * n,
+    }, columns=UUL_COLUMNS)
+
+    # Low-cardinality strings as category, free text as Arrow strings —
+    # cheap to concat and to scan downstream
+    for col in CATEGORICAL_COLS:
+        df[col] = df[col].astype("category")
+    for col in ARROW_STRING_COLS:
+        df[col] = df[col].astype(STRING_DTYPE)
+
+    valid = ts.notna()
+    if not valid.all():
+        df = df.loc[valid.to_numpy()].reset_index(drop=True)
+        if df.empty:
+            return create_empty_uul(), user_id
     return df, user_id
 
 
@@ -189,17 +209,28 @@ def parse_wechat(data_dir: str) -> pd.DataFrame:
     if not files:
         return create_empty_uul()
 
-    dfs = []
-    for f in files:
-        df, _ = parse_wechat_file(f)
-        dfs.append(df)
-
-    merged = pd.concat(dfs, ignore_index=True)
-
-    # Deduplicate by transaction_id (in case quarterly files overlap)
-    merged = merged.drop_duplicates(subset=["transaction_id"], keep="first")
-
-    # Sort by timestamp descending
-    merged = merged.sort_values("timestamp", ascending=False).reset_index(drop=True)
+    # Quarterly files are independent and CPU-bound — parse across cores.
+    # A single file isn't worth the process spawn overhead
+    if len(files) > 1:
+        with ProcessPoolExecutor() as ex:
+            results = list(ex.map(parse_wechat_file, files))
+    else:
+        results = [parse_wechat_file(files[0])]
+    dfs = [df for df, _ in results]
+
+    # Align category sets across quarterly frames so concat merges codes
+    # instead of falling back to object columns
+    merged = pd.concat(unify_categoricals(dfs), ignore_index=True)
+
+    # Deduplicate by transaction_id (in case quarterly files overlap) —
+    # one duplicated mask, sliced only when overlaps actually exist
+    dup = merged["transaction_id"].duplicated(keep="first").to_numpy()
+    if dup.any():
+        merged = merged.loc[~dup]
+
+    # Sort by timestamp descending: argsort the raw datetime64 array and
+    # reshuffle all columns with a single take
+    order = np.argsort(merged["timestamp"].to_numpy(), kind="stable")[::-1]
+    merged = merged.take(order).reset_index(drop=True)
 
     return merged
@@ -4,6 +4,8 @@ Multi-user profile configuration.
 Maps file metadata (names, account numbers) to user IDs.
 """
 
+import functools
+
 USER_PROFILES = {
     "parko": {
         "display_name": "Parko",
@@ -19,10 +21,32 @@ USER_PROFILES = {
 }
 
 
+# Lowered once at import — the alias scan below then skips the per-call
+# .lower() allocations
+_ACCOUNT_INDEX = {
+    p["alipay_account"]: uid
+    for uid, p in USER_PROFILES.items()
+    if p.get("alipay_account")
+}
+_ALIAS_INDEX = {
+    alias.lower(): uid
+    for uid, p in USER_PROFILES.items()
+    for alias in p.get("aliases", [])
+}
+_LOWER_ALIASES = [
+    (uid, [alias.lower() for alias in p.get("aliases", [])])
+    for uid, p in USER_PROFILES.items()
+]
+
+
+@functools.lru_cache(maxsize=128)
 def identify_user(name: str = None, account: str = None) -> str:
     """
     Identify user_id from file metadata.
 
+    Quarterly exports repeat the same header metadata, so results are
+    memoized per (name, account).
+
     Args:
         name: Name or nickname found in file header (e.g. "Parko", "赵锡盛")
         account: Account number found in file header (e.g. "18211094248")
@@ -30,11 +54,16 @@ def identify_user(name: str = None, account: str = None) -> str:
     Returns:
         user_id string, or "unknown" if no match
     """
-    for uid, profile in USER_PROFILES.items():
-        if account and account == profile.get("alipay_account"):
-            return uid
-        if name:
-            for alias in profile.get("aliases", []):
-                if alias.lower() in name.lower() or name.lower() in alias.lower():
+    if account and account in _ACCOUNT_INDEX:
+        return _ACCOUNT_INDEX[account]
+    if name:
+        name_lower = name.lower()
+        # Exact alias hit is a dict probe; the substring scan below only
+        # runs for partial matches (e.g. a nickname wrapped in brackets)
+        if name_lower in _ALIAS_INDEX:
+            return _ALIAS_INDEX[name_lower]
+        for uid, aliases in _LOWER_ALIASES:
+            for alias in aliases:
+                if alias in name_lower or name_lower in alias:
                     return uid
     return "unknown"
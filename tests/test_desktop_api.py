@@ -395,6 +395,80 @@ def test_process_creates_processed_data_version_and_can_switch_versions(tmp_path
     assert tx["id"] == "tx-first"
 
 
+def test_activated_version_survives_restart_despite_newer_parquet(tmp_path, monkeypatch):
+    client, api_module = make_client(tmp_path, monkeypatch)
+    first = create_empty_uul()
+    first.loc[len(first)] = {
+        "source_platform": "alipay",
+        "user_id": "我",
+        "transaction_id": "tx-first",
+        "timestamp": "2026-01-01 10:00:00",
+        "direction": "支出",
+        "amount": 10.0,
+        "counterparty": "商户A",
+        "description": "商品",
+        "payment_method": "",
+        "status": "交易成功",
+        "platform_category": "",
+        "platform_tx_type": "",
+        "original_tx_id": "",
+        "merchant_order_id": "",
+        "note": "",
+        "track": "consumption",
+        "is_refunded": False,
+        "refund_amount": 0.0,
+        "effective_amount": 10.0,
+        "is_ignored": False,
+        "global_category_l1": "",
+        "global_category_l2": "",
+    }
+    second = first.copy()
+    second.at[0, "transaction_id"] = "tx-second"
+    frames = [first, second]
+
+    def fake_pipeline(_data_dir, output_dir):
+        # Write CSV + parquet like the real pipeline does
+        df = frames.pop(0)
+        api_module.Path(output_dir).mkdir(parents=True, exist_ok=True)
+        df.to_csv(api_module.OUTPUT_DIR / "processed_data.csv", index=False, encoding="utf-8-sig")
+        api_module._normalise_df(df.copy()).to_parquet(
+            api_module.OUTPUT_DIR / "processed_data.parquet", engine="pyarrow"
+        )
+        return df
+
+    monkeypatch.setattr(api_module, "run_pipeline", fake_pipeline)
+
+    first_version = client.post("/api/process").get_json()["processed_version"]["id"]
+    client.post("/api/process")
+    client.post("/api/processed-versions/active", json={"id": first_version})
+    # Simulate a server restart: the next read reloads from disk, where
+    # the activated CSV (restored via copy2, old mtime) must not lose to
+    # a parquet left over from the second pipeline run
+    api_module._df = None
+    tx = client.get("/api/transactions").get_json()["records"][0]
+
+    assert tx["id"] == "tx-first"
+
+
+def test_deleting_last_version_clears_served_data(tmp_path, monkeypatch):
+    client, api_module = make_client(tmp_path, monkeypatch)
+    _write_processed_fixture(api_module, [{"transaction_id": "tx-only"}])
+    version = api_module._save_processed_version()
+
+    # Warm the response/summary caches with the soon-to-be-deleted data
+    warm = client.get("/api/summary")
+    assert warm.get_json()["total_records"] == 1
+
+    deleted = client.delete(f"/api/processed-versions/{version['id']}")
+    summary = client.get("/api/summary")
+    by_category = client.get("/api/by-category?level=l1")
+
+    assert deleted.status_code == 200
+    assert deleted.get_json()["active_id"] == ""
+    assert summary.get_json()["total_records"] == 0
+    assert by_category.get_json() == []
+
+
 def test_manual_category_update_requires_processed_version_when_versions_exist(tmp_path, monkeypatch):
     client, api_module = make_client(tmp_path, monkeypatch)
     _write_processed_fixture(api_module, [{"transaction_id": "tx-1"}])
@@ -842,3 +916,28 @@ def test_model_profile_create_new_can_reuse_selected_key(tmp_path, monkeypatch):
     assert payload["profile"]["api_key_configured"] is True
     assert "sk-shared-secret" not in response.get_data(as_text=True)
     assert "sk-shared-secret" in api_module.CONFIG_PATH.read_text(encoding="utf-8")
+
+
+def test_unify_categoricals_tolerates_empty_source_frames():
+    from src.parsers.base import CATEGORICAL_COLS, UUL_COLUMNS, unify_categoricals
+
+    populated = pd.DataFrame(
+        {
+            col: ["2026-01-01 10:00:00"] if col == "timestamp" else [10.0]
+            if col in ("amount", "refund_amount", "effective_amount")
+            else [False] if col in ("is_refunded", "is_ignored") else ["x"]
+            for col in UUL_COLUMNS
+        }
+    )
+    for col in CATEGORICAL_COLS:
+        populated[col] = populated[col].astype("category")
+
+    # A header-only quarterly export yields create_empty_uul() next to
+    # populated frames — the union must not choke on its empty categories
+    merged = pd.concat(
+        unify_categoricals([populated, create_empty_uul()]), ignore_index=True
+    )
+
+    assert len(merged) == 1
+    assert isinstance(merged["source_platform"].dtype, pd.CategoricalDtype)
+    assert merged.at[0, "source_platform"] == "x"